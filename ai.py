@@ -1,114 +1,440 @@
 # ai.py
 
-from math import inf
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 from ttt_game import TicTacToe
 
+# Bit i of a bitboard is set when square i holds that player's mark
+FULL_BOARD = 0b111111111
+WIN_MASKS = TicTacToe.WIN_MASKS
+CENTER_MASK = 1 << 4
+CORNER_MASKS = (1 << 0, 1 << 2, 1 << 6, 1 << 8)
+
+# Center first, then corners, then edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+WIN_SCORE = 100
+# Integer bounds for alpha-beta; every real score lies well inside them
+NEG_INF, POS_INF = -10_000, 10_000
+# Scores beyond this are forced wins/losses, stored relative to the node in the TT
+MATE_THRESHOLD = WIN_SCORE - 10
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 100_000
+
+
+POPCOUNT = tuple(bin(bb).count("1") for bb in range(FULL_BOARD + 1))
+
+# LINE_SCORE[ai_count][human_count]: points for one line, from the AI's side.
+# Lines holding both marks are dead and stay 0.
+LINE_SCORE = (
+    (0, -2, -5, 0),
+    (2, 0, 0, 0),
+    (5, 0, 0, 0),
+    (0, 0, 0, 0),
+)
+
+
+def popcount(bb: int) -> int:
+    return POPCOUNT[bb]
+
+
+def has_line(bb: int) -> bool:
+    for mask in WIN_MASKS:
+        if bb & mask == mask:
+            return True
+    return False
+
+
+# Indexed by a player's bitboard: whether it holds a full line
+HAS_LINE = tuple(has_line(bb) for bb in range(FULL_BOARD + 1))
+
+
+def _completing_squares(bb: int) -> int:
+    squares = 0
+    for mask in WIN_MASKS:
+        missing = mask & ~bb
+        if popcount(missing) == 1:
+            squares |= missing
+    return squares
+
+
+# The 8 rotations/reflections of the board; square i maps to perm[i]
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # anti-diagonal
+)
+
+
+def _transform(bb: int, perm: Tuple[int, ...]) -> int:
+    out = 0
+    for i in range(9):
+        if bb & (1 << i):
+            out |= 1 << perm[i]
+    return out
+
+
+# SYMMETRY_TABLES[s][bb] is bitboard bb under SYMMETRIES[s]
+SYMMETRY_TABLES = tuple(
+    tuple(_transform(bb, perm) for bb in range(FULL_BOARD + 1)) for perm in SYMMETRIES
+)
+
+# INVERSE_SYMMETRIES[s] undoes SYMMETRIES[s]
+INVERSE_SYMMETRIES = tuple(tuple(perm.index(i) for i in range(9)) for perm in SYMMETRIES)
+# INVERSE_SYMMETRY_INDEX[s] is the index into SYMMETRIES of the inverse of SYMMETRIES[s]
+INVERSE_SYMMETRY_INDEX = tuple(SYMMETRIES.index(inv) for inv in INVERSE_SYMMETRIES)
+
+
+def canonical_key(own_bb: int, other_bb: int) -> Tuple[int, int]:
+    # Smallest (own << 9 | other) over the 8 symmetries, and the symmetry index giving it
+    best_key = best_sym = -1
+    for sym, table in enumerate(SYMMETRY_TABLES):
+        key = (table[own_bb] << 9) | table[other_bb]
+        if best_sym < 0 or key < best_key:
+            best_key, best_sym = key, sym
+    return best_key, best_sym
+
+
+# Indexed by a 9-bit mask: its squares as bits in MOVE_ORDER order
+ORDERED_BITS = tuple(
+    tuple(1 << m for m in MOVE_ORDER if mask & (1 << m)) for mask in range(FULL_BOARD + 1)
+)
+# Indexed by a player's bitboard: squares that would complete one of their lines
+WINNING_SQUARES = tuple(_completing_squares(bb) for bb in range(FULL_BOARD + 1))
+
+
+# max_depth -> transposition table shared by all MinimaxAI instances
+_tables: Dict[int, Dict[int, Tuple[int, int, int, int]]] = {}
+
+
 # Minimax AI with alpha-beta pruning and a point-based heuristic
 class MinimaxAI:
 
 
-    def __init__(self, ai_mark: str = "O", human_mark: str = "X", max_depth: int = 9) -> None:
+    def __init__(self, ai_mark: str = "O", human_mark: str = "X", max_depth: int = 9,
+                 iterative: bool = False, use_book: bool = True) -> None:
         self.ai_mark = ai_mark
         self.human_mark = human_mark
         self.max_depth = max_depth
+        # Deepen from 1 ply up to max_depth instead of a single full-depth pass.
+        # Off by default: on a 3x3 board the extra passes cost more nodes than
+        # the improved ordering saves.
+        self.iterative = iterative
+        # Answer from the perfect-play book whenever max_depth covers the rest of the game
+        self.use_book = use_book
         self.nodes_evaluated = 0
 
-    def get_best_move(self, game: TicTacToe) -> Tuple[int, int]:
+        # canonical_key(mover, opponent) -> (remaining depth, score, flag, best move bit)
+        self._tt = self._table()
+        # Ply limit of the current iterative-deepening pass
+        self._depth_limit = max_depth
+        # Per-depth move (as a bit) that last caused a cutoff
+        self._killers = [0] * 10
+
+    def _bitboards(self, game: TicTacToe) -> Tuple[int, int]:
+        return game.bitboard(self.ai_mark), game.bitboard(self.human_mark)
+
+    def reset_stats(self) -> None:
+        # Counters only; the shared transposition table is left intact
         self.nodes_evaluated = 0
-        best_score = -inf
+
+    def clear_table(self) -> None:
+        # Drops this difficulty's shared entries so the next search starts cold
+        self._table().clear()
+
+    def get_best_move(self, game: TicTacToe) -> Tuple[int, int]:
+        self.reset_stats()
         best_move = -1
 
-        for move in game.available_moves():
-            game.board[move] = self.ai_mark
-            score = self._minimax(game, depth=1, is_maximizing=False,
-                                  alpha=-inf, beta=inf)
-            game.board[move] = " "
+        ai_bb, human_bb = self._bitboards(game)
+        empty = ~(ai_bb | human_bb) & FULL_BOARD
+        empties = POPCOUNT[empty]
+        # Nothing to search: take a win on the spot, or the last square left
+        if empty and not HAS_LINE[ai_bb] and not HAS_LINE[human_bb]:
+            wins = WINNING_SQUARES[ai_bb] & empty
+            if wins:
+                return ORDERED_BITS[wins][0].bit_length() - 1, WIN_SCORE - 1
+            if empties == 1:
+                return empty.bit_length() - 1, 0
 
-            if score > best_score:
-                best_score = score
-                best_move = move
+        # A search this deep is exact, so the precomputed answer is the same
+        if self.use_book and 0 < empties <= self.max_depth:
+            key, sym = canonical_key(ai_bb, human_bb)
+            entry = get_book().get(key)
+            if entry is not None:
+                return INVERSE_SYMMETRIES[sym][entry[0]], entry[1]
 
-        if best_move == -1:
+        if self.max_depth <= 2:
+            pv_bit, best_score = self._shallow_root(ai_bb, human_bb)
+        else:
+            pv_bit, best_score = self._search_root(ai_bb, human_bb)
+        if pv_bit:
+            best_move = pv_bit.bit_length() - 1
+        else:
             moves = game.available_moves()
             if moves:
                 best_move = moves[0]
 
-        return best_move, int(best_score)
+        return best_move, best_score
+
+    def _shallow_root(self, ai_bb: int, human_bb: int) -> Tuple[int, int]:
+        # Easy-level depths: score the one- or two-ply frontier straight from
+        # the tables. Same result as _search_root without recursion or the TT.
+        duplicates = self._symmetric_duplicates(ai_bb, human_bb)
+        best_bit, best_score = 0, NEG_INF
+        for bit in self._ordered_moves(ai_bb, human_bb):
+            if bit & duplicates:
+                continue
+            score = self._shallow_score(ai_bb | bit, human_bb)
+            if score > best_score:
+                best_score = score
+                best_bit = bit
+        return best_bit, best_score
+
+    def _shallow_score(self, ai_bb: int, human_bb: int) -> int:
+        # Value for the AI after its root move, with the human to reply
+        self.nodes_evaluated += 1
+        if HAS_LINE[human_bb]:
+            return 1 - WIN_SCORE
+        elif HAS_LINE[ai_bb]:
+            return WIN_SCORE - 1
+        occupied = ai_bb | human_bb
+        if occupied == FULL_BOARD:
+            return 0
+        if self.max_depth <= 1:
+            return -self._heuristic_score(human_bb, ai_bb)
+
+        empty = ~occupied & FULL_BOARD
+        if WINNING_SQUARES[human_bb] & empty:
+            return 2 - WIN_SCORE
+        # No reply can win, so each one is a full board or a heuristic leaf
+        worst = POS_INF
+        for bit in ORDERED_BITS[empty]:
+            self.nodes_evaluated += 1
+            if occupied | bit == FULL_BOARD:
+                val = 0
+            else:
+                val = self._heuristic_score(ai_bb, human_bb | bit)
+            if val < worst:
+                worst = val
+        return worst
+
+    def _table(self) -> Dict[int, Tuple[int, int, int, int]]:
+        # One table per difficulty, shared by every instance so that games and
+        # fresh AIs reuse earlier work. Entries from another difficulty would
+        # make shallow searches play deeper.
+        tt = _tables.setdefault(self.max_depth, {})
+        if len(tt) > TT_MAX_ENTRIES:
+            tt.clear()
+        return tt
+
+    def _search_root(self, ai_bb: int, human_bb: int) -> Tuple[int, int]:
+        self._tt = self._table()
+        self._killers = [0] * 10
+        best_score = NEG_INF
+
+        empties = popcount(~(ai_bb | human_bb) & FULL_BOARD)
+        duplicates = self._symmetric_duplicates(ai_bb, human_bb)
+        pv_bit = 0
+        first_limit = 1 if self.iterative else self.max_depth
+        for limit in range(first_limit, self.max_depth + 1):
+            self._depth_limit = limit
+            best_score = NEG_INF
+            for bit in self._ordered_moves(ai_bb, human_bb, pv_bit):
+                if bit & duplicates:
+                    continue
+                # Later moves only need to prove they can't beat the best so far
+                score = -self._negamax(human_bb, ai_bb | bit, 1, NEG_INF, -best_score)
+
+                if score > best_score:
+                    best_score = score
+                    pv_bit = bit
+
+            # A forced result can't change with more depth, and neither can
+            # anything once the limit covers every empty square
+            if abs(best_score) > MATE_THRESHOLD or limit >= empties:
+                break
+
+        return pv_bit, best_score
 
-    def _minimax(self,
-                 game: TicTacToe,
+    def _negamax(self,
+                 own_bb: int,
+                 other_bb: int,
                  depth: int,
-                 is_maximizing: bool,
-                 alpha: float,
-                 beta: float) -> float:
+                 alpha: int,
+                 beta: int) -> int:
+        # Scores are from the side to move (own_bb). Hot path: table lookups
+        # and plain comparisons instead of helper calls.
         self.nodes_evaluated += 1
-        winner = game.get_winner()
-        if winner == self.ai_mark:
-            return 100 - depth  
-        elif winner == self.human_mark:
-            return depth - 100  
-        elif winner == "Tie":
+        if HAS_LINE[own_bb]:
+            return WIN_SCORE - depth
+        elif HAS_LINE[other_bb]:
+            return depth - WIN_SCORE
+        occupied = own_bb | other_bb
+        if occupied == FULL_BOARD:
             return 0
 
-        if depth >= self.max_depth:
-            return self._heuristic_score(game.board)
-
-        if is_maximizing:
-            best_val = -inf
-            for move in game.available_moves():
-                game.board[move] = self.ai_mark
-                val = self._minimax(game, depth + 1, False, alpha, beta)
-                game.board[move] = " "
-                best_val = max(best_val, val)
-                alpha = max(alpha, val)
-                if beta <= alpha:
-                    break
-            return best_val
+        if depth >= self._depth_limit:
+            return self._heuristic_score(own_bb, other_bb)
+
+        empty = ~occupied & FULL_BOARD
+        # Winning next move is the best any child can score, no need to recurse
+        if WINNING_SQUARES[own_bb] & empty:
+            return WIN_SCORE - depth - 1
+
+        # Searching deeper than the squares left changes nothing, so cap it
+        # to let full-depth entries be reused from any root
+        remaining = min(self._depth_limit - depth, POPCOUNT[empty])
+        # Symmetric positions share an entry; its move is kept in the canonical orientation
+        key, sym = canonical_key(own_bb, other_bb)
+        tt = self._tt
+        entry = tt.get(key)
+        # Only an entry searched to the same remaining depth gives the score: a
+        # deeper one from an earlier root would let a depth-limited search play
+        # deeper than asked. Any entry's move is still a good first try.
+        preferred = self._killers[depth]
+        if entry is not None:
+            preferred |= SYMMETRY_TABLES[INVERSE_SYMMETRY_INDEX[sym]][entry[3]]
+        if entry is not None and entry[0] == remaining:
+            score = self._score_from_tt(entry[1], depth)
+            if entry[2] == EXACT:
+                return score
+            if entry[2] == LOWER:
+                if score > alpha:
+                    alpha = score
+            elif score < beta:
+                beta = score
+            if beta <= alpha:
+                return score
+        alpha_orig, beta_orig = alpha, beta
+
+        best_val = NEG_INF
+        for bit in self._ordered_moves(own_bb, other_bb, preferred):
+            val = -self._negamax(other_bb, own_bb | bit, depth + 1, -beta, -alpha)
+            if val > best_val:
+                best_val = val
+                best_bit = bit
+                if val > alpha:
+                    alpha = val
+            if alpha >= beta:
+                self._killers[depth] = bit
+                break
+
+        if best_val <= alpha_orig:
+            flag = UPPER
+        elif best_val >= beta_orig:
+            flag = LOWER
         else:
-            best_val = inf
-            for move in game.available_moves():
-                game.board[move] = self.human_mark
-                val = self._minimax(game, depth + 1, True, alpha, beta)
-                game.board[move] = " "
-                best_val = min(best_val, val)
-                beta = min(beta, val)
-                if beta <= alpha:
-                    break
-            return best_val
-
-    def _heuristic_score(self, board) -> float:
+            flag = EXACT
+        tt[key] = (remaining, self._score_to_tt(best_val, depth), flag, SYMMETRY_TABLES[sym][best_bit])
+        return best_val
+
+    @staticmethod
+    def _symmetric_duplicates(ai_bb: int, human_bb: int) -> int:
+        # Moves that a symmetry of the current position maps onto an earlier
+        # move score the same, so only one move per class is searched
+        stabilizers = [
+            perm for perm, table in zip(SYMMETRIES, SYMMETRY_TABLES)
+            if table[ai_bb] == ai_bb and table[human_bb] == human_bb
+        ]
+        duplicates = 0
+        if len(stabilizers) == 1:
+            return duplicates
+        for bit in ORDERED_BITS[~(ai_bb | human_bb) & FULL_BOARD]:
+            if bit & duplicates:
+                continue
+            move = bit.bit_length() - 1
+            for perm in stabilizers:
+                duplicates |= 1 << perm[move]
+            duplicates &= ~bit
+        return duplicates
+
+    @staticmethod
+    def _ordered_moves(own_bb: int, other_bb: int, preferred: int = 0) -> Tuple[int, ...]:
+        # Immediate wins, then blocks, then preferred (PV/TT/killer) moves,
+        # then the static MOVE_ORDER
+        empty = ~(own_bb | other_bb) & FULL_BOARD
+        wins = WINNING_SQUARES[own_bb] & empty
+        blocks = WINNING_SQUARES[other_bb] & empty & ~wins
+        preferred &= empty & ~(wins | blocks)
+        if not wins and not blocks and not preferred:
+            return ORDERED_BITS[empty]
+        return (ORDERED_BITS[wins] + ORDERED_BITS[blocks] + ORDERED_BITS[preferred]
+                + ORDERED_BITS[empty & ~(wins | blocks | preferred)])
+
+    @staticmethod
+    def _score_to_tt(score: int, depth: int) -> int:
+        if score > MATE_THRESHOLD:
+            return score + depth
+        if score < -MATE_THRESHOLD:
+            return score - depth
+        return score
+
+    @staticmethod
+    def _score_from_tt(score: int, depth: int) -> int:
+        if score > MATE_THRESHOLD:
+            return score - depth
+        if score < -MATE_THRESHOLD:
+            return score + depth
+        return score
+
+    # Swapping the two sides negates the score, so it works for whichever side is passed first
+    def _heuristic_score(self, ai_bb: int, human_bb: int) -> int:
         score = 0
-        if board[4] == self.ai_mark:
+        if ai_bb & CENTER_MASK:
             score += 3
-        elif board[4] == self.human_mark:
+        elif human_bb & CENTER_MASK:
             score -= 3
 
-        for c in [0, 2, 6, 8]:
-            if board[c] == self.ai_mark:
+        for c in CORNER_MASKS:
+            if ai_bb & c:
                 score += 2
-            elif board[c] == self.human_mark:
+            elif human_bb & c:
                 score -= 2
 
-        for a, b, c in TicTacToe.WINNING_COMBOS:
-            score += self._score_line([board[a], board[b], board[c]])
+        for mask in WIN_MASKS:
+            score += LINE_SCORE[POPCOUNT[ai_bb & mask]][POPCOUNT[human_bb & mask]]
 
         return score
 
-    def _score_line(self, line) -> int:
-        ai_count = line.count(self.ai_mark)
-        human_count = line.count(self.human_mark)
-        empty_count = line.count(" ")
 
-        if ai_count > 0 and human_count > 0:
-            return 0
-        if ai_count == 2 and empty_count == 1:
-            return 5
-        if ai_count == 1 and empty_count == 2:
-            return 2
-        if human_count == 2 and empty_count == 1:
-            return -5
-        if human_count == 1 and empty_count == 2:
-            return -2
-        return 0
+_book: Optional[Dict[int, Tuple[int, int]]] = None
+
+
+def build_book() -> Dict[int, Tuple[int, int]]:
+    # Solve every position reachable from the empty board (either side
+    # starting), keyed by canonical_key(mover, opponent) -> (move in the
+    # canonical orientation, score). Symmetric positions share one entry.
+    solver = MinimaxAI(max_depth=9, use_book=False)
+    book = {}
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        own_bb, other_bb = stack.pop()
+        key, sym = canonical_key(own_bb, other_bb)
+        if key in seen:
+            continue
+        seen.add(key)
+        occupied = own_bb | other_bb
+        if HAS_LINE[own_bb] or HAS_LINE[other_bb] or occupied == FULL_BOARD:
+            continue
+
+        bit, score = solver._search_root(own_bb, other_bb)
+        book[key] = (SYMMETRIES[sym][bit.bit_length() - 1], score)
+        for bit in ORDERED_BITS[~occupied & FULL_BOARD]:
+            stack.append((other_bb, own_bb | bit))
+    return book
+
+
+def get_book() -> Dict[int, Tuple[int, int]]:
+    global _book
+    if _book is None:
+        _book = build_book()
+    return _book
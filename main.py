@@ -1,7 +1,8 @@
+import threading
 import tkinter as tk
 from tkinter import ttk
 
-from ttt_game import TicTacToe
+from ttt_game import FIRST_LINE, NO_LINE, TicTacToe
 from ai import MinimaxAI
 from tutor import explain_move
 
@@ -17,6 +18,10 @@ class TicTacToeGUI:
 
         self.difficulty_levels = {"Easy": 2, "Medium": 4, "Hard": 9}
         self.current_difficulty = tk.StringVar(value="Hard")
+        # Bumped on every reset so callbacks from an earlier game are dropped
+        self.game_number = 0
+        # Serializes access to the AI between search threads and the UI
+        self.ai_lock = threading.Lock()
         self.ai = MinimaxAI(
             ai_mark=self.ai_mark,
             human_mark=self.human_mark,
@@ -29,6 +34,9 @@ class TicTacToeGUI:
         self.ties = 0
 
         self.buttons = []
+        # Last text/bg sent to each button, so redraws only touch what changed
+        self.button_text = [None] * 9
+        self.button_bg = [None] * 9
         self.status_label = None
         self.explanation_label = None
         self.countdown_after_id = None
@@ -92,27 +100,36 @@ class TicTacToeGUI:
             self.root.after_cancel(self.countdown_after_id)
             self.countdown_after_id = None
 
+    def config_button(self, i, text=None, bg=None):
+        options = {}
+        if text is not None and text != self.button_text[i]:
+            options["text"] = self.button_text[i] = text
+        if bg is not None and bg != self.button_bg[i]:
+            options["bg"] = self.button_bg[i] = bg
+        if options:
+            self.buttons[i].config(**options)
+
     def update_board(self):
         for i in range(9):
-            self.buttons[i].config(text=self.game.board[i], bg="SystemButtonFace")
+            self.config_button(i, text=self.game.board[i], bg="SystemButtonFace")
 
     def update_status(self, text):
         self.status_label.config(text=text)
 
     def on_change_difficulty(self, _):
-        self.ai.max_depth = self.difficulty_levels[self.current_difficulty.get()]
+        # Picked up by the next search, so a running one doesn't block the UI
         self.update_status(f"Difficulty set to {self.current_difficulty.get()}. Your turn (X).")
 
     def highlight_winning_line(self):
-        from ttt_game import TicTacToe as G
-        for a, b, c in G.WINNING_COMBOS:
-            if self.game.board[a] == self.game.board[b] == self.game.board[c] != " ":
-                for idx in (a, b, c):
-                    self.buttons[idx].config(bg="lightgreen")
-                break
+        # The line that decided the game is the winner's first completed one
+        line = FIRST_LINE[self.game.bitboard(self.game.get_winner())]
+        if line != NO_LINE:
+            for idx in TicTacToe.WINNING_COMBOS[line]:
+                self.config_button(idx, bg="lightgreen")
 
     def reset_game(self):
         self.cancel_countdown()
+        self.game_number += 1
         self.game.reset()
         self.update_board()
         self.update_status("Your turn (X).")
@@ -131,7 +148,8 @@ class TicTacToeGUI:
         self.tie_score_label.config(text=f"Ties: {self.ties}")
 
     def player_move(self, index):
-        if self.game.game_over() or self.game.board[index] != " ":
+        if (self.game.game_over() or self.game.current_player != self.human_mark
+                or self.game.board[index] != " "):
             return
 
         self.game.make_move(index)
@@ -142,18 +160,49 @@ class TicTacToeGUI:
             self.end_game()
             return
 
-        self.root.after(250, self.ai_move)
+        self.root.after(250, lambda n=self.game_number: self.ai_move(n))
 
-    def ai_move(self):
-        if self.game.game_over():
+    def ai_move(self, game_number):
+        if game_number != self.game_number or self.game.game_over():
+            return
+
+        # The tutor explains against the pre-move board; skip the copy when it's off
+        original = self.game.board[:] if self.tutor_enabled.get() else None
+        search_game = TicTacToe()
+        search_game.board = self.game.clone_board()
+        search_game.current_player = self.game.current_player
+        max_depth = self.difficulty_levels[self.current_difficulty.get()]
+        result = []
+        done = threading.Event()
+        threading.Thread(target=self.search_worker, args=(search_game, max_depth, result, done),
+                         daemon=True).start()
+        self.root.after(30, lambda: self.check_ai_done(game_number, result, done, original))
+
+    def search_worker(self, game, max_depth, result, done):
+        # done is set even if the search raises; result is then left empty
+        try:
+            with self.ai_lock:
+                self.ai.max_depth = max_depth
+                result.extend(self.ai.get_best_move(game))
+        finally:
+            done.set()
+
+    def check_ai_done(self, game_number, result, done, original):
+        if game_number != self.game_number:
+            return
+        if not done.is_set():
+            self.root.after(30, lambda: self.check_ai_done(game_number, result, done, original))
             return
 
-        original = self.game.clone_board()
-        move, score = self.ai.get_best_move(self.game)
+        if result:
+            move, score = result
+        else:
+            # The search failed; play the first open square so the game goes on
+            move, score = self.game.available_moves()[0], None
         self.game.make_move(move)
         self.update_board()
 
-        if self.tutor_enabled.get():
+        if original is not None and score is not None:
             msg = explain_move(original, move, self.ai_mark, self.human_mark) + f"\n\nMove Score: {score}"
             if not self.explanation_label.winfo_ismapped():
                 self.explanation_label.pack(pady=8)
@@ -1,13 +1,28 @@
+import argparse
+import random
 import time
-from typing import Dict, List, Tuple, Set
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple, Set
 from ttt_game import TicTacToe
 from ai import MinimaxAI
 
+# Fast calls are repeated until at least this much time has been measured
+MIN_MEASURE_NS = 10_000_000
+
+# One AI (O vs X) per difficulty, shared by every test
+AIS = {depth: MinimaxAI(ai_mark="O", human_mark="X", max_depth=depth) for depth in (2, 4, 9)}
+
 
 class PerformanceMetrics:
 
-    def __init__(self):
-        self.move_times: List[float] = []
+    def __init__(self, record_all: bool = False):
+        # Running totals; individual samples are only kept when asked for
+        self.time_count: int = 0
+        self.time_total: float = 0.0
+        self.time_min: float = 0.0
+        self.time_max: float = 0.0
+        # Packed float64 seconds rather than a list of float objects
+        self.move_times: Optional[array] = array("d") if record_all else None
         self.nodes_evaluated: int = 0
         self.total_moves: int = 0
         self.correct_moves: int = 0
@@ -15,16 +30,23 @@ class PerformanceMetrics:
         self.optimal_move_found: int = 0
         
     def add_time(self, elapsed: float):
-        self.move_times.append(elapsed)
+        if self.time_count == 0 or elapsed < self.time_min:
+            self.time_min = elapsed
+        if elapsed > self.time_max:
+            self.time_max = elapsed
+        self.time_count += 1
+        self.time_total += elapsed
+        if self.move_times is not None:
+            self.move_times.append(elapsed)
         
     def average_time(self) -> float:
-        return sum(self.move_times) / len(self.move_times) if self.move_times else 0
+        return self.time_total / self.time_count if self.time_count else 0
     
     def min_time(self) -> float:
-        return min(self.move_times) if self.move_times else 0
+        return self.time_min
     
     def max_time(self) -> float:
-        return max(self.move_times) if self.move_times else 0
+        return self.time_max
     
     def correctness_rate(self) -> float:
 
@@ -35,32 +57,92 @@ def count_nodes(ai: MinimaxAI, game: TicTacToe) -> int:
     return ai.nodes_evaluated
 
 
+def measure(fn: Callable[[], Tuple[int, int]],
+            repeats: Optional[int] = None,
+            reset: Optional[Callable[[], None]] = None) -> Tuple[Tuple[int, int], float]:
+    # Returns the first call's result and the average seconds per call. reset
+    # runs untimed before every call so repeats don't reuse the last call's state.
+    count = 0
+    result = None
+    elapsed = 0
+    while True:
+        if reset is not None:
+            reset()
+        start = time.perf_counter_ns()
+        value = fn()
+        elapsed += time.perf_counter_ns() - start
+        if result is None:
+            result = value
+        count += 1
+        if count == repeats or (repeats is None and elapsed >= MIN_MEASURE_NS):
+            break
+    return result, elapsed / count / 1e9
+
+
+def format_nodes(nodes: int, elapsed: float) -> str:
+    rate = nodes / elapsed if elapsed > 0 else 0
+    return f"{nodes} ({rate:,.0f} nodes/s)"
+
+
+def sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+# A move is optimal when it keeps the best result (win/tie/loss) that perfect
+# play can reach from this position; full-depth AIs answer from the solved book
 def test_move_quality(ai: MinimaxAI, game: TicTacToe) -> Tuple[int, int]:
-    move, ai_score = ai.get_best_move(game)
-    
-    game_copy = TicTacToe()
-    game_copy.board = game.board[:]
-    game_copy.current_player = game.current_player
-    
-    all_moves_scores = []
-    for candidate_move in game_copy.available_moves():
-        game_copy.board[candidate_move] = ai.ai_mark
-        score = ai._minimax(game_copy, depth=1, is_maximizing=False, 
-                           alpha=float('-inf'), beta=float('inf'))
+    move, _ = ai.get_best_move(game)
     
-    if not all_moves_scores:
-        return 0, 0
+    perfect = MinimaxAI(ai_mark=ai.ai_mark, human_mark=ai.human_mark, max_depth=9)
+    _, best_possible_score = perfect.get_best_move(game)
     
-    best_possible_score = max(score for _, score in all_moves_scores)
+    # Play the move on the caller's game and take it back once it's scored
+    game.apply(move, ai.ai_mark)
+    winner = game.get_winner()
+    if winner is None:
+        opponent = MinimaxAI(ai_mark=ai.human_mark, human_mark=ai.ai_mark, max_depth=9)
+        move_score = -opponent.get_best_move(game)[1]
+    else:
+        move_score = 1 if winner == ai.ai_mark else 0
+    game.unapply(move, ai.ai_mark)
     
-    is_optimal = ai_score == best_possible_score
+    is_optimal = sign(move_score) == sign(best_possible_score)
     correctness_score = 100 if is_optimal else 0
     
     return correctness_score, best_possible_score
 
+# Score each difficulty's move against perfect play on positions with O to move
+def test_move_quality_all_depths() -> Dict[str, PerformanceMetrics]:
+    test_boards = [
+        ["X", " ", " ", " ", " ", " ", " ", " ", " "],
+        [" ", " ", " ", " ", "X", " ", " ", " ", " "],
+        [" ", "X", " ", " ", " ", " ", " ", " ", " "],
+        ["X", " ", " ", " ", "O", " ", " ", " ", "X"],  # Opposite corners: O must take an edge
+        ["X", "X", " ", " ", "O", " ", " ", " ", " "],
+        ["X", " ", "O", " ", "X", " ", " ", " ", " "],
+        [" ", "X", " ", "X", "O", " ", " ", " ", " "],
+        ["O", "O", " ", "X", "X", " ", "X", " ", " "],
+    ]
+    depths = {"Easy (d=2)": 2, "Medium (d=4)": 4, "Hard (d=9)": 9}
+    
+    results = {}
+    game = TicTacToe()
+    for difficulty, depth in depths.items():
+        metrics = PerformanceMetrics()
+        for board in test_boards:
+            game.board = board
+            game.current_player = "O"
+            correctness_score, _ = test_move_quality(AIS[depth], game)
+            metrics.total_evaluated += 1
+            if correctness_score == 100:
+                metrics.correct_moves += 1
+        results[difficulty] = metrics
+    
+    return results
+
 # Play multiple full games where AI plays optimally
 def test_ai_never_loses() -> Tuple[int, int, int]:
-    ai = MinimaxAI(ai_mark="O", human_mark="X", max_depth=9)
+    ai = AIS[9]
     wins = 0
     ties = 0
     losses = 0
@@ -109,7 +191,7 @@ def test_ai_never_loses() -> Tuple[int, int, int]:
 
 
 def test_winning_move_detection() -> int:
-    ai = MinimaxAI(ai_mark="O", human_mark="X", max_depth=9)
+    ai = AIS[9]
     test_cases = [
         # (board, expected_winning_move, description)
         (["O", "O", " ", "X", "X", " ", " ", " ", " "], 2, "O wins at 2"),
@@ -120,18 +202,16 @@ def test_winning_move_detection() -> int:
     ]
     
     correct_count = 0
+    game = TicTacToe()
     for board, expected_move, description in test_cases:
-        game = TicTacToe()
         game.board = board
         game.current_player = "O"
         
         move, score = ai.get_best_move(game)
         
         # Move is correct if it wins or has a very high score (>90)
-        game_test = TicTacToe()
-        game_test.board = board[:]
-        game_test.board[move] = "O"
-        is_winning = game_test.get_winner() == "O"
+        game.apply(move, "O")
+        is_winning = game.get_winner() == "O"
         has_high_score = score > 90
         
         if is_winning or has_high_score:
@@ -144,7 +224,7 @@ def test_winning_move_detection() -> int:
 
 
 def test_blocking_move_detection() -> int:
-    ai = MinimaxAI(ai_mark="O", human_mark="X", max_depth=9)
+    ai = AIS[9]
     test_cases = [
         # (board, position_where_opponent_wins_if_not_blocked)
         (["X", "X", " ", " ", "O", " ", " ", " ", " "], 2),
@@ -153,27 +233,23 @@ def test_blocking_move_detection() -> int:
     ]
     
     correct_blocks = 0
+    game = TicTacToe()
     for board, must_block_pos in test_cases:
-        game = TicTacToe()
         game.board = board
         game.current_player = "O"
         
         move, _ = ai.get_best_move(game)
         
         # After AI's move, check if opponent can still win immediately
-        game_after_ai = TicTacToe()
-        game_after_ai.board = board[:]
-        game_after_ai.board[move] = "O"
-        game_after_ai.current_player = "X"
+        game.apply(move, "O")
         
         opponent_can_win_next = False
-        for opp_move in game_after_ai.available_moves():
-            game_after_ai.board[opp_move] = "X"
-            if game_after_ai.get_winner() == "X":
-                opponent_can_win_next = True
-                game_after_ai.board[opp_move] = " "
+        for opp_move in game.available_moves():
+            game.apply(opp_move, "X")
+            opponent_can_win_next = game.get_winner() == "X"
+            game.unapply(opp_move, "X")
+            if opponent_can_win_next:
                 break
-            game_after_ai.board[opp_move] = " "
         
         # AI did well if opponent can't win immediately
         if not opponent_can_win_next:
@@ -181,96 +257,62 @@ def test_blocking_move_detection() -> int:
     
     return correct_blocks
 
-# Test AI performance on the first move
-def test_first_move():
+LATENCY_DEPTHS = {"Easy (depth 2)": 2, "Medium (depth 4)": 4, "Hard (depth 9)": 9}
+
+
+# Time every difficulty on each board (O to move), reusing the shared AIs.
+# Each call starts from an empty table so times and nodes are for a real search.
+def run_latency_sweep(title: str, boards: List[Tuple[str, List[str]]], depths: Dict[str, int]):
     print("\n" + "="*70)
-    print("TEST 1: First Move Performance (Latency)")
+    print(title)
     print("="*70)
     
-    results: Dict[str, PerformanceMetrics] = {
-        "Easy (depth 2)": PerformanceMetrics(),
-        "Medium (depth 4)": PerformanceMetrics(),
-        "Hard (depth 9)": PerformanceMetrics(),
-    }
-    
-    depths = {"Easy (depth 2)": 2, "Medium (depth 4)": 4, "Hard (depth 9)": 9}
-    
-    for difficulty, depth in depths.items():
-        game = TicTacToe()
-        ai = MinimaxAI(max_depth=depth)
-        
-        start = time.time()
-        move, score = ai.get_best_move(game)
-        elapsed = time.time() - start
+    game = TicTacToe()
+    for description, board in boards:
+        game.board = board
+        game.current_player = "O"
         
-        results[difficulty].add_time(elapsed)
+        if game.game_over():
+            print(f"\n{description}: Game already over, skipping")
+            continue
         
-        print(f"\n{difficulty}:")
-        print(f"  Best move: {move} (position {move + 1})")
-        print(f"  Score: {score}")
-        print(f"  Time: {elapsed:.4f}s")
+        # Buffered so no console output lands between timed calls
+        out = [f"\n{description} ({len(game.available_moves())} available moves):"]
+        for difficulty, depth in depths.items():
+            ai = AIS[depth]
+            (move, score), elapsed = measure(lambda: ai.get_best_move(game),
+                                             1 if depth == 9 else None, ai.clear_table)
+            out.append(f"  {difficulty}:")
+            out.append(f"    Best move: {move} (position {move + 1}), Score: {score}")
+            out.append(f"    Time: {elapsed * 1000:.3f}ms")
+            out.append(f"    Nodes: {format_nodes(count_nodes(ai, game), elapsed)}")
+        print("\n".join(out))
+
+# Test AI performance on the first move
+def test_first_move():
+    run_latency_sweep("TEST 1: First Move Performance (Latency)",
+                      [("Empty board", [" "] * 9)], LATENCY_DEPTHS)
 
 # Test AI performance in mid-game scenarios
 def test_mid_game_performance():
-    print("\n" + "="*70)
-    print("TEST 2: Mid-Game Performance (Latency)")
-    print("="*70)
-    
-    # Create a mid-game board state
     mid_game_board = [
         "X", " ", "O",
         " ", "X", " ",
         " ", " ", "O"
     ]
-    
-    depths = {"Easy (depth 2)": 2, "Medium (depth 4)": 4, "Hard (depth 9)": 9}
-    
-    for difficulty, depth in depths.items():
-        game = TicTacToe()
-        game.board = mid_game_board[:]
-        game.current_player = "O"
-        
-        ai = MinimaxAI(max_depth=depth)
-        
-        start = time.time()
-        move, score = ai.get_best_move(game)
-        elapsed = time.time() - start
-        
-        print(f"\n{difficulty}:")
-        print(f"  Best move: {move} (position {move + 1})")
-        print(f"  Score: {score}")
-        print(f"  Time: {elapsed:.4f}s")
+    run_latency_sweep("TEST 2: Mid-Game Performance (Latency)",
+                      [("Mid-game", mid_game_board)], LATENCY_DEPTHS)
 
 # Test AI performance when close to winning/losing
 def test_endgame_performance():
-    print("\n" + "="*70)
-    print("TEST 3: Endgame Performance - Winning Move (Latency)")
-    print("="*70)
-    
     # Board where AI has two in a row and can win
     winning_move_board = [
         "O", "O", " ",
         "X", "X", " ",
         " ", " ", " "
     ]
-    
-    depths = {"Easy (depth 2)": 2, "Medium (depth 4)": 4, "Hard (depth 9)": 9}
-    
-    for difficulty, depth in depths.items():
-        game = TicTacToe()
-        game.board = winning_move_board[:]
-        game.current_player = "O"
-        
-        ai = MinimaxAI(max_depth=depth)
-        
-        start = time.time()
-        move, score = ai.get_best_move(game)
-        elapsed = time.time() - start
-        
-        print(f"\n{difficulty}:")
-        print(f"  Best move: {move} (position {move + 1}) - WINNING MOVE")
-        print(f"  Score: {score}")
-        print(f"  Time: {elapsed:.4f}s")
+    run_latency_sweep("TEST 3: Endgame Performance - Winning Move (Latency)",
+                      [("Winning move at 2", winning_move_board)], LATENCY_DEPTHS)
 
 # Run multiple games and collect statistics
 def test_multiple_games():
@@ -280,41 +322,39 @@ def test_multiple_games():
     
     metrics = PerformanceMetrics()
     game_count = 10
+    ai = AIS[9]
     
     for game_num in range(game_count):
         game = TicTacToe()
-        ai = MinimaxAI(max_depth=9)
+        # The human plays the first free square of a shuffled order, seeded per
+        # game so the latency stats are comparable between runs
+        human_order = random.Random(42 + game_num).sample(range(9), 9)
         moves_made = 0
         
         while not game.game_over() and moves_made < 5:  
-            available = game.available_moves()
-            if not available:
-                break
-            
             # Make a random valid move for human to set up different scenarios
-            import random
-            human_move = random.choice(available)
+            human_move = next(m for m in human_order if game.board[m] == " ")
             game.make_move(human_move)
             
             if game.game_over():
                 break
             
             # AI move
-            start = time.time()
-            move, score = ai.get_best_move(game)
-            elapsed = time.time() - start
+            (move, score), elapsed = measure(lambda: ai.get_best_move(game), 1)
             metrics.add_time(elapsed)
+            metrics.nodes_evaluated += count_nodes(ai, game)
             
             game.make_move(move)
             moves_made += 1
     
     print(f"\nGames played: {game_count}")
-    print(f"Total moves evaluated: {len(metrics.move_times)}")
+    print(f"Total moves evaluated: {metrics.time_count}")
     print(f"\nMove Time Statistics:")
-    print(f"  Average: {metrics.average_time():.4f}s")
-    print(f"  Minimum: {metrics.min_time():.4f}s")
-    print(f"  Maximum: {metrics.max_time():.4f}s")
-    print(f"  Total time: {sum(metrics.move_times):.4f}s")
+    print(f"  Average: {metrics.average_time() * 1000:.3f}ms")
+    print(f"  Minimum: {metrics.min_time() * 1000:.3f}ms")
+    print(f"  Maximum: {metrics.max_time() * 1000:.3f}ms")
+    print(f"  Total time: {metrics.time_total * 1000:.3f}ms")
+    print(f"  Nodes: {format_nodes(metrics.nodes_evaluated, metrics.time_total)}")
 
 # Test if AI never loses at EACH difficulty level
 def test_never_loses_all_depths():
@@ -325,7 +365,7 @@ def test_never_loses_all_depths():
     depths = {"Easy (d=2)": 2, "Medium (d=4)": 4, "Hard (d=9)": 9}
     
     for difficulty, depth in depths.items():
-        ai = MinimaxAI(ai_mark="O", human_mark="X", max_depth=depth)
+        ai = AIS[depth]
         wins = 0
         ties = 0
         losses = 0
@@ -385,10 +425,10 @@ def test_move_selection_across_depths():
     ]
     
     depths = {"Easy (d=2)": 2, "Medium (d=4)": 4, "Hard (d=9)": 9}
+    game = TicTacToe()
     
     for board_desc, board in test_boards:
-        game = TicTacToe()
-        game.board = board[:]
+        game.board = board
         game.current_player = "O"
         
         if game.game_over():
@@ -400,8 +440,7 @@ def test_move_selection_across_depths():
         
         move_results = {}
         for difficulty, depth in depths.items():
-            ai = MinimaxAI(ai_mark="O", human_mark="X", max_depth=depth)
-            move, score = ai.get_best_move(game)
+            move, score = AIS[depth].get_best_move(game)
             move_results[difficulty] = (move, score)
             print(f"  {difficulty:15} -> Move {move} (pos {move+1}), Score: {score}")
         
@@ -424,7 +463,7 @@ def test_full_game_trace():
         print(f"\n{difficulty} - Full Game Trace:")
         
         game = TicTacToe()
-        ai = MinimaxAI(ai_mark="O", human_mark="X", max_depth=depth)
+        ai = AIS[depth]
         move_num = 0
         
         # Use deterministic strategy for human
@@ -464,10 +503,6 @@ def test_full_game_trace():
 
 # Compare AI response time across different board state
 def compare_board_complexity():
-    print("\n" + "="*70)
-    print("TEST 8: Response Time by Board Complexity (Latency)")
-    print("="*70)
-    
     test_boards = [
         ("Empty board", [" "] * 9),
         ("1 move each", ["X", " ", " ", " ", "O", " ", " ", " ", " "]),
@@ -475,37 +510,11 @@ def compare_board_complexity():
         ("3 moves each", ["X", " ", "O", " ", "X", " ", "O", " ", "X"]),
         ("4 moves each", ["X", "O", "X", " ", "O", "X", "O", " ", " "]),
     ]
-    
-    ai = MinimaxAI(max_depth=9)
-    
-    for description, board in test_boards:
-        game = TicTacToe()
-        game.board = board[:]
-        game.current_player = "O"
-        
-        if game.game_over():
-            print(f"\n{description}: Game already over, skipping")
-            continue
-        
-        start = time.time()
-        move, score = ai.get_best_move(game)
-        elapsed = time.time() - start
-        
-        available_moves = len(game.available_moves())
-        print(f"\n{description}:")
-        print(f"  Available moves: {available_moves}")
-        print(f"  Move chosen: {move} (position {move + 1})")
-        print(f"  Time: {elapsed:.4f}s")
+    run_latency_sweep("TEST 8: Response Time by Board Complexity (Latency)",
+                      test_boards, {"Hard (depth 9)": 9})
 
-# Run all performance tests
-def main():
-    print("\n" + "="*70)
-    print("MINIMAX AI PERFORMANCE & CORRECTNESS TESTING SUITE")
-    print("="*70)
-    
-    # ========================================================================
-    # CORRECTNESS TESTS (Algorithm Validation)
-    # ========================================================================
+# Correctness tests (algorithm validation)
+def run_correctness():
     print("\n" + "="*70)
     print("CORRECTNESS TESTS (Move Optimality)")
     print("="*70)
@@ -547,6 +556,19 @@ def main():
     else:
         print(f"  PARTIAL: AI failed to block {total_block_tests - blocks_correct} threat(s)")
     
+    print("\n" + "="*70)
+    print("CORRECTNESS TEST 4: Move Quality vs Perfect Play")
+    print("="*70)
+    for difficulty, metrics in test_move_quality_all_depths().items():
+        print(f"\n{difficulty}: {metrics.correct_moves}/{metrics.total_evaluated} optimal")
+        print(f"  Accuracy: {metrics.correctness_rate():.1f}%")
+        if metrics.correct_moves == metrics.total_evaluated:
+            print("  PASS: Every move keeps the best reachable result")
+        else:
+            print(f"  PARTIAL: {metrics.total_evaluated - metrics.correct_moves} suboptimal move(s)")
+
+
+def run_depth_comparison():
     print("\n" + "="*70)
     print("DEPTH COMPARISON TESTS (Easy vs Medium vs Hard)")
     print("="*70)
@@ -554,7 +576,9 @@ def main():
     test_never_loses_all_depths()
     test_move_selection_across_depths()
     test_full_game_trace()
-    
+
+
+def run_latency():
     print("\n" + "="*70)
     print("LATENCY TESTS (Performance)")
     print("="*70)
@@ -564,6 +588,28 @@ def main():
     test_endgame_performance()
     test_multiple_games()
     compare_board_complexity()
+
+
+# Run the selected sections (all of them by default)
+def main():
+    parser = argparse.ArgumentParser(description="Minimax AI performance and correctness tests")
+    parser.add_argument("--correctness", action="store_true", help="run the correctness tests")
+    parser.add_argument("--depth", action="store_true", help="run the depth comparison tests")
+    parser.add_argument("--latency", action="store_true", help="run the latency tests")
+    parser.add_argument("--all", action="store_true", help="run every section (default)")
+    args = parser.parse_args()
+    run_all = args.all or not (args.correctness or args.depth or args.latency)
+    
+    print("\n" + "="*70)
+    print("MINIMAX AI PERFORMANCE & CORRECTNESS TESTING SUITE")
+    print("="*70)
+    
+    if run_all or args.correctness:
+        run_correctness()
+    if run_all or args.depth:
+        run_depth_comparison()
+    if run_all or args.latency:
+        run_latency()
     
     print("\n" + "="*70)
     print("TESTING COMPLETE")
@@ -62,6 +62,36 @@ class TestTicTacToeGame(unittest.TestCase):
         self.assertEqual(self.game.board, [" "] * 9)
         self.assertEqual(self.game.current_player, "X")
 
+    # Undoing a winning placement should clear the winner again
+    def test_apply_unapply(self):
+        self.game.board = ["X", "X", " ", " ", " ", " ", " ", " ", " "]
+        self.game.apply(2, "X")
+        self.assertEqual(self.game.get_winner(), "X")
+        self.assertEqual(self.game.bitboard("X"), 0b111)
+        self.game.unapply(2, "X")
+        self.assertIsNone(self.game.get_winner())
+        self.assertEqual(self.game.bitboard("X"), 0b011)
+        self.assertEqual(self.game.available_moves(), [2, 3, 4, 5, 6, 7, 8])
+
+    # Writing a square in place should keep the winner and open squares in sync
+    def test_board_item_assignment(self):
+        self.game.board = ["X", "X", " ", " ", " ", " ", " ", " ", " "]
+        self.game.board[2] = "X"
+        self.assertEqual(self.game.get_winner(), "X")
+        self.assertEqual(self.game.available_moves(), [3, 4, 5, 6, 7, 8])
+        self.assertEqual(self.game.bitboard("X"), 0b111)
+        self.game.board[2] = " "
+        self.assertIsNone(self.game.get_winner())
+        self.assertEqual(self.game.available_moves(), [2, 3, 4, 5, 6, 7, 8])
+
+    # Loading bitboards should match assigning the same board
+    def test_reset_to(self):
+        self.game.reset_to(0b100010001, 0b000000110, "O")
+        self.assertEqual(self.game.board, ["X", "O", "O", " ", "X", " ", " ", " ", "X"])
+        self.assertEqual(self.game.available_moves(), [3, 5, 6, 7])
+        self.assertEqual(self.game.get_winner(), "X")
+        self.assertEqual(self.game.current_player, "O")
+
 # Test AI move selection
 class TestMinimaxAI(unittest.TestCase):
     
@@ -74,6 +104,14 @@ class TestMinimaxAI(unittest.TestCase):
         move, score = self.ai.get_best_move(self.game)
         self.assertIn(move, self.game.available_moves())
     
+    # AI should see squares written straight into the board
+    def test_ai_sees_in_place_writes(self):
+        self.game.board[0] = "X"
+        self.game.board[1] = "X"
+        self.game.current_player = "O"
+        move, score = self.ai.get_best_move(self.game)
+        self.assertEqual(move, 2)
+
     # AI should play a winning move
     def test_ai_finds_winning_move(self):
         self.game.board = ["O", "O", " ", "X", "X", " ", " ", " ", " "]
@@ -88,6 +126,32 @@ class TestMinimaxAI(unittest.TestCase):
         move, score = self.ai.get_best_move(self.game)
         self.assertEqual(move, 2)  # Blocking pos
     
+    # Book answers should score the same as a full search
+    def test_book_matches_search(self):
+        searching_ai = MinimaxAI(max_depth=9, use_book=False)
+        for board in ([" "] * 9,
+                      ["X", " ", " ", " ", "O", " ", " ", " ", "X"],
+                      ["X", "X", " ", "O", " ", " ", " ", " ", " "]):
+            self.game.board = board
+            move, score = self.ai.get_best_move(self.game)
+            self.assertIn(move, self.game.available_moves())
+            self.assertEqual(score, searching_ai.get_best_move(self.game)[1])
+
+    # A depth-limited search shouldn't depend on what was searched before it
+    def test_search_independent_of_earlier_searches(self):
+        medium_ai = MinimaxAI(max_depth=4, use_book=False)
+        board = ["X", "O", " ", " ", "X", " ", "O", " ", " "]
+        for other in (["X", " ", " ", " ", "O", " ", "X", "X", "O"],
+                      ["X", " ", " ", " ", "X", " ", "O", " ", " "],
+                      ["X", "O", " ", "X", " ", " ", " ", " ", " "]):
+            self.game.board = other
+            medium_ai.get_best_move(self.game)
+        self.game.board = board
+        self.game.current_player = "O"
+        # Same move and score as a search from an empty table
+        self.assertEqual(medium_ai.get_best_move(self.game), (8, -3))
+        self.assertEqual(medium_ai.get_best_move(self.game), (8, -3))
+
     # AI should support different depth levels
     def test_difficulty_levels(self):
         easy_ai = MinimaxAI(max_depth=2)
@@ -1,7 +1,25 @@
 from typing import List, Optional
 
+
+# The list TicTacToe.board returns: writing a square in place re-derives the
+# game's bitboards, open squares and winner so they can't go stale
+class _Board(list):
+
+    __slots__ = ("_game",)
+
+    def __init__(self, game: "TicTacToe", squares: List[str]) -> None:
+        super().__init__(squares)
+        self._game = game
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._game._sync()
+
+
 class TicTacToe:
 
+    __slots__ = ("_board", "_bits", "_available", "_winner", "current_player")
+
     WINNING_COMBOS = [
         (0, 1, 2),
         (3, 4, 5),
@@ -13,35 +31,104 @@ class TicTacToe:
         (2, 4, 6),
     ]
 
+    # Bit i is set when square i is part of the line
+    WIN_MASKS = tuple((1 << a) | (1 << b) | (1 << c) for a, b, c in WINNING_COMBOS)
+
+    # make_move/apply/unapply update the bitboards, winner and move list
+    # incrementally; assigning board or writing board[i] rebuilds them
     def __init__(self) -> None:
-        self.board: List[str] = [" "] * 9
+        self.board = [" "] * 9
         self.current_player: str = "X"
 
+    @property
+    def board(self) -> List[str]:
+        return self._board
+
+    @board.setter
+    def board(self, board: List[str]) -> None:
+        self._board = _Board(self, board)
+        self._sync()
+
+    def _sync(self) -> None:
+        self._bits = {"X": 0, "O": 0}
+        for i, v in enumerate(self._board):
+            if v in self._bits:
+                self._bits[v] |= 1 << i
+        self._available = [i for i, v in enumerate(self._board) if v == " "]
+        self._winner = self._find_winner()
+
     def reset(self) -> None:
-        self.board = [" "] * 9
-        self.current_player = "X"
+        self.reset_to(0, 0, "X")
+
+    # Load a position from bitboards without building a board list first
+    def reset_to(self, x_bits: int, o_bits: int, player: str) -> None:
+        occupied = x_bits | o_bits
+        self._board = _Board(self, ["X" if x_bits >> i & 1 else "O" if o_bits >> i & 1 else " " for i in range(9)])
+        self._bits = {"X": x_bits, "O": o_bits}
+        self._available = [i for i in range(9) if not occupied >> i & 1]
+        self._winner = self._find_winner()
+        self.current_player = player
 
     def available_moves(self) -> List[int]:
-        return [i for i, v in enumerate(self.board) if v == " "]
+        return self._available[:]
 
     def make_move(self, index: int) -> bool:
         if 0 <= index < 9 and self.board[index] == " ":
-            self.board[index] = self.current_player
+            self.apply(index, self.current_player)
             self.current_player = "O" if self.current_player == "X" else "X"
             return True
         return False
 
+    def apply(self, index: int, mark: str) -> None:
+        list.__setitem__(self._board, index, mark)
+        self._available.remove(index)
+        bits = self._bits[mark] | (1 << index)
+        self._bits[mark] = bits
+        if FIRST_LINE[bits] != NO_LINE or not self._available:
+            self._winner = self._find_winner()
+
+    def unapply(self, index: int, mark: str) -> None:
+        list.__setitem__(self._board, index, " ")
+        self._available.append(index)
+        self._available.sort()
+        self._bits[mark] &= ~(1 << index)
+        self._winner = self._find_winner()
+
+    def bitboard(self, mark: str) -> int:
+        return self._bits.get(mark, 0)
+
     def is_full(self) -> bool:
-        return all(v != " " for v in self.board)
+        return not self._available
 
-    def get_winner(self) -> Optional[str]:
-        for a, b, c in self.WINNING_COMBOS:
-            if self.board[a] != " " and self.board[a] == self.board[b] == self.board[c]:
-                return self.board[a]
+    def _find_winner(self) -> Optional[str]:
+        # The earlier line in WINNING_COMBOS decides a board where both have one
+        x_line = FIRST_LINE[self._bits["X"]]
+        o_line = FIRST_LINE[self._bits["O"]]
+        if x_line < o_line:
+            return "X"
+        if o_line < x_line:
+            return "O"
         return "Tie" if self.is_full() else None
 
+    def get_winner(self) -> Optional[str]:
+        return self._winner
+
     def game_over(self) -> bool:
         return self.get_winner() is not None
 
     def clone_board(self) -> List[str]:
         return self.board[:]
+
+
+NO_LINE = len(TicTacToe.WIN_MASKS)
+
+
+def _first_line(bits: int) -> int:
+    for line, mask in enumerate(TicTacToe.WIN_MASKS):
+        if bits & mask == mask:
+            return line
+    return NO_LINE
+
+
+# Indexed by a player's bitboard: the first WINNING_COMBOS line it completes, or NO_LINE
+FIRST_LINE = tuple(_first_line(bits) for bits in range(1 << 9))
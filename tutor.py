@@ -1,41 +1,45 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence, Tuple
 
-WINNING_COMBOS = [
-    (0, 1, 2),
-    (3, 4, 5),
-    (6, 7, 8),
-    (0, 3, 6),
-    (1, 4, 7),
-    (2, 5, 8),
-    (0, 4, 8),
-    (2, 4, 6),
-]
+from ttt_game import FIRST_LINE, NO_LINE, TicTacToe
+
+WINNING_COMBOS = TicTacToe.WINNING_COMBOS
+
+
+# Bit i is set when square i holds mark
+def board_bits(board: Sequence[str], mark: str) -> int:
+    bits = 0
+    for i, v in enumerate(board):
+        if v == mark:
+            bits |= 1 << i
+    return bits
 
 
 def is_winning_board(board: List[str], mark: str) -> bool:
-    for a, b, c in WINNING_COMBOS:
-        if board[a] == board[b] == board[c] == mark:
-            return True
-    return False
+    return FIRST_LINE[board_bits(board, mark)] != NO_LINE
 
 
-def move_blocks_win(original_board: List[str],
+def move_blocks_win(original_board: Sequence[str],
                     move: int,
                     ai_mark: str,
                     human_mark: str) -> bool:
-    tmp = original_board[:]
-    tmp[move] = human_mark
-    return is_winning_board(tmp, human_mark)
+    return FIRST_LINE[board_bits(original_board, human_mark) | (1 << move)] != NO_LINE
 
 
 def explain_move(original_board: List[str],
                  move: int,
                  ai_mark: str,
                  human_mark: str) -> str:
-    board_after = original_board[:]
-    board_after[move] = ai_mark
+    return _explain_move_cached(tuple(original_board), move, ai_mark, human_mark)
+
 
-    if is_winning_board(board_after, ai_mark):
+# The explanation depends only on the position and move, so repeats are free
+@lru_cache(maxsize=8192)
+def _explain_move_cached(original_board: Tuple[str, ...],
+                         move: int,
+                         ai_mark: str,
+                         human_mark: str) -> str:
+    if FIRST_LINE[board_bits(original_board, ai_mark) | (1 << move)] != NO_LINE:
         return (
             f"I placed {ai_mark} at position {move + 1} to create three in a row "
             "and win the game."